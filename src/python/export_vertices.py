@@ -5,6 +5,7 @@ Supports rotation and vertical scale animations at 25 keyframes/second
 """
 
 import numpy as np
+import itertools
 import json
 import sys
 from skybrush_export_v2 import export_vertices_to_skybrush
@@ -14,20 +15,26 @@ def find_shortest_edge(vertices, faces):
     """
     Find the shortest edge length in the polyhedron.
     """
-    vertices = np.array(vertices, dtype=float)
-    min_edge_length = float('inf')
+    vertices = np.asarray(vertices, dtype=float)
 
-    for face in faces:
-        for i in range(len(face)):
-            v1_idx = face[i]
-            v2_idx = face[(i + 1) % len(face)]
-            v1 = vertices[v1_idx]
-            v2 = vertices[v2_idx]
-            edge_length = np.linalg.norm(v2 - v1)
-            if edge_length > 1e-10 and edge_length < min_edge_length:
-                min_edge_length = edge_length
+    # Flatten faces into one index array; each index's edge partner is the
+    # next index in its face, wrapping from the last back to the first
+    sizes = np.fromiter((len(face) for face in faces), dtype=np.intp, count=len(faces))
+    sizes = sizes[sizes > 0]
+    if len(sizes) == 0:
+        return 1.0
+    src = np.fromiter(itertools.chain.from_iterable(faces), dtype=np.intp, count=int(sizes.sum()))
+    starts = np.cumsum(sizes) - sizes
+    next_pos = np.arange(1, len(src) + 1)
+    next_pos[starts + sizes - 1] = starts
+    dst = src[next_pos]
 
-    return min_edge_length if min_edge_length != float('inf') else 1.0
+    # Compare squared lengths and take a single sqrt at the end
+    edges = vertices[dst] - vertices[src]
+    sq_lengths = np.einsum('ij,ij->i', edges, edges)
+    sq_lengths = sq_lengths[sq_lengths > 1e-20]
+
+    return float(np.sqrt(sq_lengths.min())) if len(sq_lengths) > 0 else 1.0
 
 
 def rescale_by_shortest_edge(vertices, faces, target_edge_length=4.0, altitude_offset=15.0):
@@ -35,7 +42,7 @@ def rescale_by_shortest_edge(vertices, faces, target_edge_length=4.0, altitude_o
     Rescale vertices so the shortest edge equals target_edge_length,
     then add altitude_offset to all Z coordinates.
     """
-    vertices = np.array(vertices, dtype=float)
+    vertices = np.asarray(vertices, dtype=float)
 
     if len(vertices) == 0:
         return vertices
@@ -49,17 +56,17 @@ def rescale_by_shortest_edge(vertices, faces, target_edge_length=4.0, altitude_o
     print(f"  Shortest edge: {shortest_edge:.4f}")
     print(f"  Scale factor: {scale:.4f} (target edge: {target_edge_length})")
 
-    # Center the vertices first
+    # Center XY at the origin and shift Z so its minimum is at altitude_offset,
+    # folded into a single affine pass applied in place on one output buffer
     center = np.mean(vertices, axis=0)
-    rescaled = (vertices - center) * scale
-
-    # Re-center at origin for XY, but shift Z up
-    rescaled[:, 0] -= np.mean(rescaled[:, 0])
-    rescaled[:, 1] -= np.mean(rescaled[:, 1])
-
-    # Shift Z so minimum is at altitude_offset
-    z_min = np.min(rescaled[:, 2])
-    rescaled[:, 2] += (altitude_offset - z_min)
+    z_min = np.min(vertices[:, 2])
+    bias = np.array([
+        -center[0] * scale,
+        -center[1] * scale,
+        altitude_offset - z_min * scale
+    ])
+    rescaled = np.multiply(vertices, scale)
+    rescaled += bias
 
     print(f"  Altitude offset: +{altitude_offset} units")
 
@@ -71,7 +78,7 @@ def rescale_vertices_to_bounds(vertices, xy_bounds=(-50, 50), z_bounds=(0, 100))
     Rescale vertices to target bounds while maintaining aspect ratio.
     (Legacy function - kept for compatibility)
     """
-    vertices = np.array(vertices, dtype=float)
+    vertices = np.asarray(vertices, dtype=float)
 
     if len(vertices) == 0:
         return vertices
@@ -96,14 +103,14 @@ def rescale_vertices_to_bounds(vertices, xy_bounds=(-50, 50), z_bounds=(0, 100))
     target_range = min(xy_range, z_range)
     scale = target_range / max_range
 
-    rescaled = (vertices - center) * scale
-
     xy_center = (xy_bounds[0] + xy_bounds[1]) / 2
     z_center = (z_bounds[0] + z_bounds[1]) / 2
 
-    rescaled[:, 0] += xy_center
-    rescaled[:, 1] += xy_center
-    rescaled[:, 2] += z_center
+    # Center, scale and move to the target center in a single affine pass,
+    # applied in place on one output buffer
+    bias = np.array([xy_center, xy_center, z_center]) - center * scale
+    rescaled = np.multiply(vertices, scale)
+    rescaled += bias
 
     return rescaled
 
@@ -118,6 +125,7 @@ def export_with_config(config):
         output_file = config.get('outputFile', 'vertices_show.skyc')
         animation = config.get('animation', {})
         bounds = config.get('bounds', {})
+        workers = int(config.get('workers', 1))
 
         if len(vertices) == 0:
             print("Error: No vertices to export")
@@ -137,7 +145,7 @@ def export_with_config(config):
         # Rescale vertices based on shortest edge
         if len(faces) > 0:
             rescaled = rescale_by_shortest_edge(
-                np.array(vertices),
+                np.asarray(vertices, dtype=float),
                 faces,
                 target_edge_length=target_edge_length,
                 altitude_offset=altitude_offset
@@ -149,16 +157,18 @@ def export_with_config(config):
             z_min = bounds.get('zMin', 0)
             z_max = bounds.get('zMax', 100)
             rescaled = rescale_vertices_to_bounds(
-                np.array(vertices),
+                np.asarray(vertices, dtype=float),
                 xy_bounds=(xy_min, xy_max),
                 z_bounds=(z_min, z_max)
             )
             # Add altitude offset
             rescaled[:, 2] += altitude_offset
 
-        print(f"  Final range: X[{np.min(rescaled[:, 0]):.2f}, {np.max(rescaled[:, 0]):.2f}], "
-              f"Y[{np.min(rescaled[:, 1]):.2f}, {np.max(rescaled[:, 1]):.2f}], "
-              f"Z[{np.min(rescaled[:, 2]):.2f}, {np.max(rescaled[:, 2]):.2f}]")
+        mins = rescaled.min(axis=0)
+        maxs = rescaled.max(axis=0)
+        print(f"  Final range: X[{mins[0]:.2f}, {maxs[0]:.2f}], "
+              f"Y[{mins[1]:.2f}, {maxs[1]:.2f}], "
+              f"Z[{mins[2]:.2f}, {maxs[2]:.2f}]")
 
         # Export to Skybrush
         success = export_vertices_to_skybrush(
@@ -166,7 +176,8 @@ def export_with_config(config):
             output_file=output_file,
             fps=fps,
             show_title="Polyhedron Animation",
-            animation=animation
+            animation=animation,
+            workers=workers
         )
 
         return success
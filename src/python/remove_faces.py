@@ -9,49 +9,150 @@ import argparse
 import numpy as np
 
 
+# Line prefixes (after stripping) of vertex and face statements
+VERTEX_PREFIXES = (b'v ', b'v\t')
+FACE_PREFIXES = (b'f ', b'f\t')
+
+
+def parse_numbers(text, dtype, count):
+    """Parse exactly count whitespace-separated numbers from a bytes block"""
+    values = np.fromstring(text, dtype=dtype, sep=' ')
+    if len(values) != count:
+        raise ValueError(f"expected {count} numbers, parsed {len(values)}")
+    return values
+
+
+def split_rows(rows):
+    """
+    Join stripped statement lines into one block without their keyword.
+
+    Returns (block, buf, space, starts, sizes): the joined bytes, a uint8 view
+    of them, the whitespace mask, the offset of every token and the number of
+    tokens on each row.
+    """
+    # Every body now starts with whitespace (or is empty)
+    block = b'\n'.join([row[1:] for row in rows])
+    buf = np.frombuffer(block, dtype=np.uint8)
+    space = buf <= ord(' ')  # space, tab, CR and LF all sort below printables
+
+    # A token starts at every non-space byte that follows a space
+    starts = np.flatnonzero(~space[1:] & space[:-1]) + 1
+    newlines = np.flatnonzero(buf == ord('\n'))
+    tokens_before_newline = np.searchsorted(starts, newlines)
+    sizes = np.diff(np.append(tokens_before_newline, len(starts)), prepend=0)
+    return block, buf, space, starts, sizes
+
+
+def parse_obj_vertices(rows):
+    """Parse stripped 'v' lines into an (N, 3) array of coordinates"""
+    if not rows:
+        return np.empty((0, 3))
+
+    block, _, _, _, sizes = split_rows(rows)
+    if np.all(sizes == 3):
+        return parse_numbers(block, np.float64, 3 * len(rows)).reshape(-1, 3)
+
+    # Some vertices carry w or colour components (or too few coordinates, in
+    # which case they are skipped) - keep only x, y, z
+    coords = [row.split()[1:4] for row in rows]
+    coords = [c for c in coords if len(c) == 3]
+    return np.array(coords).astype(np.float64).reshape(-1, 3)
+
+
+def parse_obj_faces(rows):
+    """
+    Parse stripped 'f' lines into vertex indices.
+
+    Returns (flat, sizes): the vertex index of every reference, concatenated
+    face after face, and the number of references in each face.
+    """
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    block, buf, space, ref_starts, sizes = split_rows(rows)
+    if len(ref_starts) == 0:
+        # Only bare 'f' lines; fromstring reads whitespace as a single 0
+        return np.empty(0, dtype=np.int64), sizes
+    if b'/' not in block:
+        return parse_numbers(block, np.int64, len(ref_starts)), sizes
+
+    # Parse the v, vt and vn numbers of every reference alike, then keep the
+    # first number of each reference - its vertex index
+    sep = space | (buf == ord('/'))
+    num_starts = np.flatnonzero(~sep[1:] & sep[:-1]) + 1
+    values = parse_numbers(block.replace(b'/', b' '), np.int64, len(num_starts))
+    first = np.searchsorted(num_starts, ref_starts)
+    if len(num_starts) == 0 or not np.array_equal(
+            num_starts[np.minimum(first, len(num_starts) - 1)], ref_starts):
+        raise ValueError("face reference without a vertex index")
+    return values[first], sizes
+
+
 class OBJMesh:
     """Class to handle OBJ file operations"""
 
-    def __init__(self, filepath):
+    def __init__(self, filepath, preserve_order=False):
         self.filepath = filepath
-        self.vertices = []
-        self.faces = []
-        self.other_lines = []  # Store comments, normals, textures, etc.
+        self.preserve_order = preserve_order
+        self.vertices = np.empty((0, 3))  # (N, 3) float64 coordinates
+        # Faces in CSR form: face i references faces_flat[face_offsets[i]:face_offsets[i + 1]]
+        self.faces_flat = np.empty(0, dtype=np.int32)
+        self.face_offsets = np.zeros(1, dtype=np.int64)
+        # With preserve_order: comments, normals, textures, etc. (raw bytes), and for
+        # each of them the number of v/f statements that came before it in the file
+        self.other_lines = None
+        self.other_line_slots = None
+        # With preserve_order: whether each original v/f statement was a face, and the
+        # original statement number of every remaining vertex and face
+        self.statement_is_face = None
+        self.vertex_ids = None
+        self.face_ids = None
         self.load()
 
+    @property
+    def n_faces(self):
+        """Number of faces in the mesh"""
+        return len(self.face_offsets) - 1
+
+    @property
+    def face_sizes(self):
+        """Number of vertices in each face"""
+        return np.diff(self.face_offsets)
+
+    @property
+    def faces(self):
+        """Faces as a list of vertex index lists"""
+        flat = self.faces_flat.tolist()
+        offsets = self.face_offsets.tolist()
+        return [flat[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
     def load(self):
         """Load OBJ file"""
         try:
-            with open(self.filepath, 'r') as f:
-                for line in f:
-                    line = line.strip()
-
-                    if not line or line.startswith('#'):
-                        self.other_lines.append(line)
-                        continue
-
-                    parts = line.split()
-                    if not parts:
-                        continue
-
-                    if parts[0] == 'v':
-                        # Vertex
-                        if len(parts) >= 4:
-                            self.vertices.append([float(parts[1]), float(parts[2]), float(parts[3])])
-                            self.other_lines.append(None)  # Placeholder
-                    elif parts[0] == 'f':
-                        # Face - extract vertex indices
-                        face_indices = []
-                        for vertex_ref in parts[1:]:
-                            # Handle v, v/vt, v/vt/vn, v//vn formats
-                            idx = vertex_ref.split('/')[0]
-                            face_indices.append(int(idx))
-                        self.faces.append(face_indices)
-                        self.other_lines.append(None)  # Placeholder
-                    else:
-                        self.other_lines.append(line)
-
-            print(f"Loaded: {len(self.vertices)} vertices, {len(self.faces)} faces")
+            with open(self.filepath, 'rb') as f:
+                lines = [line.strip() for line in f.read().splitlines()]
+
+            # Sort lines by statement in one pass keyed on their first two bytes,
+            # then parse vertices and faces in bulk. A bare 'v' keyword has no
+            # coordinates and is dropped; a bare 'f' stays a face statement.
+            vertex_rows, face_rows, other_lines = [], [], []
+            rows_by_prefix = dict.fromkeys(VERTEX_PREFIXES, vertex_rows)
+            rows_by_prefix.update(dict.fromkeys(FACE_PREFIXES + (b'f',), face_rows))
+            rows_by_prefix[b'v'] = []
+            select = rows_by_prefix.get
+            for line in lines:
+                select(line[:2], other_lines).append(line)
+
+            self.vertices = parse_obj_vertices(vertex_rows)
+            flat, sizes = parse_obj_faces(face_rows)
+            self.faces_flat = flat.astype(np.int32)
+            self.face_offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+
+            if self.preserve_order:
+                self.other_lines = other_lines
+                self.record_line_order(lines, vertex_rows)
+
+            print(f"Loaded: {len(self.vertices)} vertices, {self.n_faces} faces")
 
         except FileNotFoundError:
             print(f"Error: File '{self.filepath}' not found")
@@ -60,20 +161,47 @@ class OBJMesh:
             print(f"Error loading file: {e}")
             sys.exit(1)
 
+    def record_line_order(self, lines, vertex_rows):
+        """Remember where the non-geometry lines sit among the v/f statements"""
+        kinds = dict.fromkeys(VERTEX_PREFIXES, 1)
+        kinds.update(dict.fromkeys(FACE_PREFIXES + (b'f',), 2))
+        kinds[b'v'] = 3  # dropped, like vertex rows without three coordinates
+        kind = np.array([kinds.get(line[:2], 0) for line in lines], dtype=np.uint8)
+        if len(self.vertices) != len(vertex_rows):
+            short = np.array([len(row.split()) < 4 for row in vertex_rows])
+            kind[np.flatnonzero(kind == 1)[short]] = 3
+
+        is_statement = (kind == 1) | (kind == 2)
+        self.other_line_slots = np.cumsum(is_statement)[kind == 0]
+        self.statement_is_face = kind[is_statement] == 2
+        self.vertex_ids = np.flatnonzero(~self.statement_is_face)
+        self.face_ids = np.flatnonzero(self.statement_is_face)
+
+    def keep_faces(self, mask):
+        """Keep only the faces where mask is True, in their original order"""
+        sizes = self.face_sizes
+        self.faces_flat = self.faces_flat[np.repeat(mask, sizes)]
+        self.face_offsets = np.concatenate(([0], np.cumsum(sizes[mask]))).astype(np.int64)
+        if self.face_ids is not None:
+            self.face_ids = self.face_ids[mask]
+
     def remove_faces(self, face_indices):
         """Remove faces by their indices"""
-        face_indices = sorted(set(face_indices), reverse=True)
-        removed_count = 0
+        face_indices = np.asarray(face_indices, dtype=np.int64)
+        n_faces = self.n_faces
+        in_range = (face_indices >= 0) & (face_indices < n_faces)
+
+        for idx in np.unique(face_indices[~in_range])[::-1]:
+            print(f"Warning: Face index {idx} out of range (0-{n_faces-1})")
 
-        for idx in face_indices:
-            if 0 <= idx < len(self.faces):
-                del self.faces[idx]
-                removed_count += 1
-            else:
-                print(f"Warning: Face index {idx} out of range (0-{len(self.faces)-1})")
+        # Duplicate indices just clear the same slot again
+        keep = np.ones(n_faces, dtype=bool)
+        keep[face_indices[in_range]] = False
+        removed_count = n_faces - int(np.count_nonzero(keep))
+        self.keep_faces(keep)
 
         print(f"Removed {removed_count} faces")
-        print(f"Remaining: {len(self.faces)} faces")
+        print(f"Remaining: {self.n_faces} faces")
         return removed_count
 
     def remove_faces_by_criteria(self, criteria_func):
@@ -91,34 +219,36 @@ class OBJMesh:
             print("No faces match the criteria")
             return 0
 
+    def remove_faces_where_size(self, op, n):
+        """Remove faces by vertex count: op is 'eq', 'lt' or 'gt' compared against n"""
+        compare = {'eq': np.equal, 'lt': np.less, 'gt': np.greater}[op]
+        faces_to_remove = np.flatnonzero(compare(self.face_sizes, n))
+
+        if len(faces_to_remove):
+            print(f"Found {len(faces_to_remove)} faces matching criteria")
+            return self.remove_faces(faces_to_remove)
+        else:
+            print("No faces match the criteria")
+            return 0
+
     def remove_unused_vertices(self):
         """Remove vertices that are not referenced by any face"""
-        # Find which vertices are used
-        used_vertices = set()
-        for face in self.faces:
-            for v_idx in face:
-                used_vertices.add(v_idx - 1)  # OBJ indices start at 1
-
-        # Create mapping from old to new indices
-        old_to_new = {}
-        new_vertices = []
-        new_idx = 1  # OBJ indices start at 1
-
-        for old_idx in range(len(self.vertices)):
-            if old_idx in used_vertices:
-                old_to_new[old_idx + 1] = new_idx
-                new_vertices.append(self.vertices[old_idx])
-                new_idx += 1
-
-        # Update face indices
-        new_faces = []
-        for face in self.faces:
-            new_face = [old_to_new[v_idx] for v_idx in face]
-            new_faces.append(new_face)
-
-        removed = len(self.vertices) - len(new_vertices)
-        self.vertices = new_vertices
-        self.faces = new_faces
+        n_vertices = len(self.vertices)
+        if len(self.faces_flat) and (self.faces_flat.min() < 1 or self.faces_flat.max() > n_vertices):
+            raise ValueError(f"Faces reference vertices outside 1-{n_vertices}")
+
+        # Mark which vertices are used (OBJ indices start at 1, slot 0 unused)
+        used = np.zeros(n_vertices + 1, dtype=bool)
+        used[self.faces_flat] = True
+
+        # A used vertex's new index is the number of used vertices up to it
+        new_index = np.cumsum(used, dtype=np.int32)
+        self.faces_flat = new_index[self.faces_flat]
+
+        removed = n_vertices - int(new_index[-1])
+        self.vertices = self.vertices[used[1:]]
+        if self.vertex_ids is not None:
+            self.vertex_ids = self.vertex_ids[used[1:]]
 
         if removed > 0:
             print(f"Removed {removed} unused vertices")
@@ -133,17 +263,24 @@ class OBJMesh:
                 f.write("# Modified OBJ file\n")
                 f.write(f"# Original: {self.filepath}\n")
                 f.write(f"# Vertices: {len(self.vertices)}\n")
-                f.write(f"# Faces: {len(self.faces)}\n\n")
+                f.write(f"# Faces: {self.n_faces}\n\n")
 
-                # Write vertices
-                for v in self.vertices:
-                    f.write(f"v {v[0]:.6f} {v[1]:.6f} {v[2]:.6f}\n")
+                # Format vertices: one row template repeated for every vertex
+                # and filled in a single format call
+                vertex_text = ("v %.6f %.6f %.6f\n" * len(self.vertices)) % tuple(self.vertices.ravel().tolist())
 
-                f.write("\n")
+                # Format faces the same way, with one row template per face size
+                row_formats = {size: "f " + " ".join(["%d"] * size) + "\n"
+                               for size in np.unique(self.face_sizes).tolist()}
+                faces_format = "".join([row_formats[size] for size in self.face_sizes.tolist()])
+                face_text = faces_format % tuple(self.faces_flat.tolist())
 
-                # Write faces
-                for face in self.faces:
-                    f.write("f " + " ".join(str(idx) for idx in face) + "\n")
+                if self.preserve_order:
+                    f.write(self.merge_original_order(vertex_text, face_text))
+                else:
+                    f.write(vertex_text)
+                    f.write("\n")
+                    f.write(face_text)
 
             print(f"\nSaved to: {output_path}")
             return True
@@ -152,6 +289,17 @@ class OBJMesh:
             print(f"Error saving file: {e}")
             return False
 
+    def merge_original_order(self, vertex_text, face_text):
+        """Interleave the remaining statements and the other lines as in the loaded file"""
+        rows = [line.decode('utf-8', 'replace') for line in self.other_lines]
+        rows += vertex_text.splitlines() + face_text.splitlines()
+
+        # An other line goes right before the statement that followed it
+        # originally; ties keep file order through the stable sort
+        keys = np.concatenate((2 * self.other_line_slots, 2 * self.vertex_ids + 1, 2 * self.face_ids + 1))
+        order = np.argsort(keys, kind='stable')
+        return "".join([rows[k] + "\n" for k in order.tolist()])
+
     def print_info(self):
         """Print mesh information"""
         print("\n" + "="*60)
@@ -159,20 +307,19 @@ class OBJMesh:
         print("="*60)
         print(f"File: {self.filepath}")
         print(f"Vertices: {len(self.vertices)}")
-        print(f"Faces: {len(self.faces)}")
+        print(f"Faces: {self.n_faces}")
 
-        if self.faces:
-            face_sizes = [len(face) for face in self.faces]
+        if self.n_faces:
+            face_sizes = self.face_sizes
             print(f"\nFace statistics:")
-            print(f"  Min vertices per face: {min(face_sizes)}")
-            print(f"  Max vertices per face: {max(face_sizes)}")
-            print(f"  Average vertices per face: {np.mean(face_sizes):.2f}")
+            print(f"  Min vertices per face: {face_sizes.min()}")
+            print(f"  Max vertices per face: {face_sizes.max()}")
+            print(f"  Average vertices per face: {face_sizes.mean():.2f}")
 
             # Count triangles, quads, etc.
-            from collections import Counter
-            size_counts = Counter(face_sizes)
+            size_counts = np.bincount(face_sizes)
             print(f"\nFace types:")
-            for size in sorted(size_counts.keys()):
+            for size in np.flatnonzero(size_counts):
                 name = {3: "triangles", 4: "quads", 5: "pentagons", 6: "hexagons"}.get(size, f"{size}-gons")
                 print(f"  {name}: {size_counts[size]}")
 
@@ -182,18 +329,21 @@ class OBJMesh:
         """List faces with their vertex indices"""
         print("\nFace list:")
         print("-"*60)
-        for i, face in enumerate(self.faces[:limit]):
-            vertex_str = ", ".join(str(idx) for idx in face)
+        shown = min(limit, self.n_faces)
+        offsets = self.face_offsets[:shown + 1].tolist()
+        flat = self.faces_flat[:offsets[-1]].tolist()
+        for i in range(shown):
+            vertex_str = ", ".join(str(idx) for idx in flat[offsets[i]:offsets[i + 1]])
             print(f"  Face {i}: [{vertex_str}]")
 
-        if len(self.faces) > limit:
-            print(f"  ... and {len(self.faces) - limit} more faces")
+        if self.n_faces > limit:
+            print(f"  ... and {self.n_faces - limit} more faces")
         print()
 
 
 def parse_index_list(index_str):
-    """Parse index string like '0,1,2' or '0-5,7,9-11' into list of indices"""
-    indices = []
+    """Parse index string like '0,1,2' or '0-5,7,9-11' into an int64 index array"""
+    pieces = []
     parts = index_str.split(',')
 
     for part in parts:
@@ -201,12 +351,12 @@ def parse_index_list(index_str):
         if '-' in part:
             # Range
             start, end = part.split('-')
-            indices.extend(range(int(start), int(end) + 1))
+            pieces.append(np.arange(int(start), int(end) + 1, dtype=np.int64))
         else:
             # Single index
-            indices.append(int(part))
+            pieces.append(np.array([int(part)], dtype=np.int64))
 
-    return indices
+    return np.concatenate(pieces)
 
 
 def main():
@@ -230,6 +380,9 @@ Examples:
   # Remove faces with more than N vertices
   python remove_faces.py model.obj --max-vertices 4 -o output.obj
 
+  # Keep comments, groups and materials where they were
+  python remove_faces.py model.obj --triangles --preserve-order -o output.obj
+
   # Just inspect the mesh
   python remove_faces.py model.obj --info
 
@@ -248,11 +401,13 @@ Examples:
     parser.add_argument('--clean-vertices', action='store_true', help='Remove unused vertices')
     parser.add_argument('--info', action='store_true', help='Show mesh information only')
     parser.add_argument('--list-faces', action='store_true', help='List all faces')
+    parser.add_argument('--preserve-order', action='store_true',
+                        help='Keep comments and other lines in their original place when saving')
 
     args = parser.parse_args()
 
     # Load mesh
-    mesh = OBJMesh(args.input)
+    mesh = OBJMesh(args.input, preserve_order=args.preserve_order)
     mesh.print_info()
 
     if args.list_faces:
@@ -274,22 +429,22 @@ Examples:
     # Remove by criteria
     if args.triangles:
         print("\nRemoving triangular faces...")
-        mesh.remove_faces_by_criteria(lambda i, f, v: len(f) == 3)
+        mesh.remove_faces_where_size('eq', 3)
         modified = True
 
     if args.quads:
         print("\nRemoving quad faces...")
-        mesh.remove_faces_by_criteria(lambda i, f, v: len(f) == 4)
+        mesh.remove_faces_where_size('eq', 4)
         modified = True
 
     if args.min_vertices:
         print(f"\nRemoving faces with fewer than {args.min_vertices} vertices...")
-        mesh.remove_faces_by_criteria(lambda i, f, v: len(f) < args.min_vertices)
+        mesh.remove_faces_where_size('lt', args.min_vertices)
         modified = True
 
     if args.max_vertices:
         print(f"\nRemoving faces with more than {args.max_vertices} vertices...")
-        mesh.remove_faces_by_criteria(lambda i, f, v: len(f) > args.max_vertices)
+        mesh.remove_faces_where_size('gt', args.max_vertices)
         modified = True
 
     # Clean up unused vertices
@@ -7,11 +7,142 @@ Export vertices to Skybrush .skyc format with animated trajectories.
 """
 
 import numpy as np
+import collections
+import itertools
 import json
 import zipfile
 import os
-import math
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_json(obj: Any) -> bytes:
+    """Encode obj as compact JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+# Drones whose keyframes are computed together in one NumPy pass. Bounds the
+# keyframe lists held at once; the (drones, keyframes) working arrays span the
+# longest drone in the batch, which differs per drone in scale modes.
+TRAJECTORY_BATCH_SIZE = 64
+
+
+def iter_position_batches(positions: np.ndarray) -> Iterator[np.ndarray]:
+    """Yield consecutive (batch, 3) slices of the drone positions."""
+    for start in range(0, len(positions), TRAJECTORY_BATCH_SIZE):
+        yield positions[start:start + TRAJECTORY_BATCH_SIZE]
+
+
+def iter_keyframes(times: np.ndarray, x, y, z, n_keyframes=None) -> Iterator[tuple]:
+    """
+    Yield each drone's rounded (times, positions) lists from batched coordinates.
+
+    x, y, z broadcast to (drones, keyframes); a coordinate that does not move
+    can be a (drones, 1) column. Times are rounded to 4 decimals and positions
+    to 6, in one NumPy pass for the whole batch. When drones have different
+    lengths, n_keyframes gives each drone's own keyframe count and the
+    coordinates cover the longest one; each drone is then cut to its own
+    length before rounding, so padding never reaches the Python lists.
+    """
+    shape = np.broadcast_shapes(np.shape(x), np.shape(y), np.shape(z), (1, len(times)))
+    positions = np.empty(shape + (3,))
+    positions[..., 0] = x
+    positions[..., 1] = y
+    positions[..., 2] = z
+    times = np.round(times, 4).tolist()
+
+    if n_keyframes is None:
+        for drone_positions in np.round(positions, 6).tolist():
+            yield times, drone_positions
+        return
+
+    for k, n in enumerate(n_keyframes.tolist()):
+        yield times[:n], np.round(positions[k, :n], 6).tolist()
+
+
+def create_trajectory_data(times: List[float], positions: List[list]) -> Dict[str, Any]:
+    """Create trajectory.json data with one [t, pos, [pos]] keyframe per position."""
+    return {"version": 1, "points": [[t, pos, [pos]] for t, pos in zip(times, positions)]}
+
+
+def encode_keyframes(times: List[float], positions: List[list]) -> bytes:
+    """
+    Encode the trajectory.json of keyframe times and positions.
+
+    Uses orjson when installed. Otherwise the fixed [t, pos, [pos]] layout is
+    written with %-formatting, about twice as fast as json.dumps on these
+    lists and the same text, since both print floats with repr.
+    """
+    if orjson is not None:
+        return orjson.dumps(create_trajectory_data(times, positions))
+
+    xyz = ['%r,%r,%r' % tuple(pos) for pos in positions]
+    points = ','.join(['[%r,[%s],[[%s]]]' % (t, q, q) for t, q in zip(times, xyz)])
+    return ('{"version":1,"points":[' + points + ']}').encode()
+
+
+def rotate_about_center(center: List[float], dx: np.ndarray, dy: np.ndarray,
+                        omega: np.ndarray, t: np.ndarray):
+    """
+    XY positions over time of drones circling center, as (drones, keyframes) arrays.
+
+    dx, dy are each drone's start offset from center and omega its angular
+    speed. cos/sin of omega * t are tabulated once per distinct speed and
+    applied to the offsets with the angle addition formulas, so drones at the
+    same radius share their trig.
+    """
+    omegas, which = np.unique(omega, return_inverse=True)
+    phase = omegas[:, None] * t
+    cos_tab = np.cos(phase)[which]
+    sin_tab = np.sin(phase)[which]
+
+    dx = dx[:, None]
+    dy = dy[:, None]
+    x = center[0] + dx * cos_tab - dy * sin_tab
+    y = center[1] + dy * cos_tab + dx * sin_tab
+    return x, y
+
+
+def create_rotation_keyframes(
+    positions: np.ndarray,
+    center: List[float],
+    rotation_speed: float,
+    duration: float,
+    fps: float = 25.0
+) -> Iterator[tuple]:
+    """
+    Create keyframes for drones rotating around the Z axis.
+
+    Batched form of create_rotation_trajectory: yields the rounded (times,
+    positions) lists of each row of positions, computing many drones at once.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+
+    # Every drone shares the same keyframe times
+    n_keyframes = int(duration * fps) + 1
+    dt = 1.0 / fps
+    t = np.arange(n_keyframes) * dt  # Time in seconds
+
+    for batch in iter_position_batches(positions):
+        # Calculate offset and radius
+        dx = batch[:, 0] - center[0]
+        dy = batch[:, 1] - center[1]
+        radius = np.sqrt(dx * dx + dy * dy)
+
+        # Angular velocity: omega = v / r (rad/s); points at center don't move
+        omega = np.divide(rotation_speed, radius, out=np.zeros_like(radius), where=radius >= 0.001)
+
+        x, y = rotate_about_center(center, dx, dy, omega, t)
+
+        yield from iter_keyframes(t, x, y, batch[:, 2:3])
 
 
 def create_rotation_trajectory(
@@ -34,39 +165,55 @@ def create_rotation_trajectory(
     Returns:
         Trajectory dictionary with keyframes
     """
-    # Calculate total keyframes
-    n_keyframes = int(duration * fps) + 1
+    times, positions = next(create_rotation_keyframes([start_pos], center, rotation_speed, duration, fps))
+    return create_trajectory_data(times, positions)
+
+
+def create_vertical_scale_keyframes(
+    positions: np.ndarray,
+    scale_start: float,
+    scale_end: float,
+    shrink_speed: float,
+    center_z: float = None,
+    fps: float = 25.0
+) -> Iterator[tuple]:
+    """
+    Create keyframes for vertical scaling (Z axis only) from both sides.
+
+    Batched form of create_vertical_scale_trajectory: yields the rounded
+    (times, positions) lists of each row of positions, computing many drones
+    at once.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
     dt = 1.0 / fps
 
-    # Calculate radius and initial angle
-    dx = start_pos[0] - center[0]
-    dy = start_pos[1] - center[1]
-    radius = math.sqrt(dx * dx + dy * dy)
-    initial_angle = math.atan2(dy, dx)
-    z = start_pos[2]
+    for batch in iter_position_batches(positions):
+        original_z = batch[:, 2]
 
-    # Angular velocity: omega = v / r (rad/s)
-    if radius < 0.001:
-        omega = 0.0  # Point at center doesn't move
-    else:
-        omega = rotation_speed / radius
+        # If no center provided, use each vertex's own Z as reference
+        batch_center_z = original_z if center_z is None else np.full(len(batch), float(center_z))
 
-    # Generate keyframes
-    points = []
-    for i in range(n_keyframes):
-        t = i * dt  # Time in seconds
+        # Calculate offset from center
+        z_offset = original_z - batch_center_z
 
-        # Calculate angle at this time
-        angle = initial_angle + omega * t
+        # Calculate each drone's duration based on total Z change and speed
+        total_z_change = np.abs(z_offset) * abs(scale_start - scale_end)
+        if shrink_speed > 0:
+            duration = np.where(total_z_change > 0, total_z_change / shrink_speed, 1.0)
+        else:
+            duration = np.ones(len(batch))
+        duration = np.maximum(duration, 0.1)  # Minimum duration
 
-        # Calculate position
-        x = center[0] + radius * math.cos(angle)
-        y = center[1] + radius * math.sin(angle)
+        n_keyframes = (duration * fps).astype(int) + 1
+        i = np.arange(n_keyframes.max())
+        progress = i / np.maximum(n_keyframes - 1, 1)[:, None]  # 0 to 1
 
-        pos = [round(x, 6), round(y, 6), round(z, 6)]
-        points.append([round(t, 4), pos, [pos]])
+        # Linear interpolation of scale
+        scale = scale_start + (scale_end - scale_start) * progress
+        # Scale from center - vertices above center move down, below move up
+        z = batch_center_z[:, None] + z_offset[:, None] * scale
 
-    return {"version": 1, "points": points}
+        yield from iter_keyframes(i * dt, batch[:, 0:1], batch[:, 1:2], z, n_keyframes)
 
 
 def create_vertical_scale_trajectory(
@@ -91,39 +238,70 @@ def create_vertical_scale_trajectory(
     Returns:
         Trajectory dictionary with keyframes
     """
-    x = start_pos[0]
-    y = start_pos[1]
-    original_z = start_pos[2]
-
-    # If no center provided, use the vertex's own Z as reference
-    if center_z is None:
-        center_z = original_z
+    times, positions = next(create_vertical_scale_keyframes(
+        [start_pos], scale_start, scale_end, shrink_speed, center_z, fps
+    ))
+    return create_trajectory_data(times, positions)
 
-    # Calculate offset from center
-    z_offset = original_z - center_z
 
-    # Calculate duration based on total Z change and speed
-    total_z_change = abs(z_offset) * abs(scale_start - scale_end)
-    duration = total_z_change / shrink_speed if shrink_speed > 0 and total_z_change > 0 else 1.0
-    duration = max(duration, 0.1)  # Minimum duration
+def create_combined_keyframes(
+    positions: np.ndarray,
+    center: List[float],
+    rotation_speed: float,
+    scale_start: float,
+    scale_end: float,
+    duration: float,
+    shrink_speed: float = 2.0,
+    center_z: float = None,
+    fps: float = 25.0
+) -> Iterator[tuple]:
+    """
+    Create keyframes combining rotation and vertical scaling from both sides.
 
-    n_keyframes = int(duration * fps) + 1
+    Batched form of create_combined_trajectory: yields the rounded (times,
+    positions) lists of each row of positions, computing many drones at once.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
     dt = 1.0 / fps
 
-    points = []
-    for i in range(n_keyframes):
-        t = i * dt
-        progress = i / max(n_keyframes - 1, 1)  # 0 to 1
+    for batch in iter_position_batches(positions):
+        original_z = batch[:, 2]
 
-        # Linear interpolation of scale
-        scale = scale_start + (scale_end - scale_start) * progress
-        # Scale from center - vertices above center move down, below move up
-        z = center_z + z_offset * scale
+        # If no center provided, use each vertex's own Z as reference
+        batch_center_z = original_z if center_z is None else np.full(len(batch), float(center_z))
 
-        pos = [round(x, 6), round(y, 6), round(z, 6)]
-        points.append([round(t, 4), pos, [pos]])
+        # Calculate offset from center
+        z_offset = original_z - batch_center_z
 
-    return {"version": 1, "points": points}
+        # Calculate shrink duration based on speed
+        total_z_change = np.abs(z_offset) * abs(scale_start - scale_end)
+        if shrink_speed > 0:
+            shrink_duration = np.where(total_z_change > 0, total_z_change / shrink_speed, duration)
+        else:
+            shrink_duration = np.full(len(batch), float(duration))
+        shrink_duration = np.maximum(shrink_duration, 0.1)
+
+        # Use the longer of the two durations
+        actual_duration = np.maximum(duration, shrink_duration)
+        n_keyframes = (actual_duration * fps).astype(int) + 1
+        t = np.arange(n_keyframes.max()) * dt
+
+        # Rotation parameters
+        dx = batch[:, 0] - center[0]
+        dy = batch[:, 1] - center[1]
+        radius = np.sqrt(dx * dx + dy * dy)
+
+        omega = np.divide(rotation_speed, radius, out=np.zeros_like(radius), where=radius > 0.001)
+
+        # Rotation (continues for full duration)
+        x, y = rotate_about_center(center, dx, dy, omega, t)
+
+        # Vertical scale from center (based on shrink duration)
+        shrink_progress = np.minimum(t / shrink_duration[:, None], 1.0)
+        scale = scale_start + (scale_end - scale_start) * shrink_progress
+        z = batch_center_z[:, None] + z_offset[:, None] * scale
+
+        yield from iter_keyframes(t, x, y, z, n_keyframes)
 
 
 def create_combined_trajectory(
@@ -154,51 +332,18 @@ def create_combined_trajectory(
     Returns:
         Trajectory dictionary with keyframes
     """
-    original_z = start_pos[2]
-
-    # If no center provided, use the vertex's own Z as reference
-    if center_z is None:
-        center_z = original_z
-
-    # Calculate offset from center
-    z_offset = original_z - center_z
-
-    # Calculate shrink duration based on speed
-    total_z_change = abs(z_offset) * abs(scale_start - scale_end)
-    shrink_duration = total_z_change / shrink_speed if shrink_speed > 0 and total_z_change > 0 else duration
-    shrink_duration = max(shrink_duration, 0.1)
-
-    # Use the longer of the two durations
-    actual_duration = max(duration, shrink_duration)
-    n_keyframes = int(actual_duration * fps) + 1
-    dt = 1.0 / fps
-
-    # Rotation parameters
-    dx = start_pos[0] - center[0]
-    dy = start_pos[1] - center[1]
-    radius = math.sqrt(dx * dx + dy * dy)
-    initial_angle = math.atan2(dy, dx)
+    times, positions = next(create_combined_keyframes(
+        [start_pos], center, rotation_speed, scale_start, scale_end,
+        duration, shrink_speed, center_z, fps
+    ))
+    return create_trajectory_data(times, positions)
 
-    omega = rotation_speed / radius if radius > 0.001 else 0.0
 
-    points = []
-    for i in range(n_keyframes):
-        t = i * dt
-
-        # Rotation (continues for full duration)
-        angle = initial_angle + omega * t
-        x = center[0] + radius * math.cos(angle)
-        y = center[1] + radius * math.sin(angle)
-
-        # Vertical scale from center (based on shrink duration)
-        shrink_progress = min(t / shrink_duration, 1.0) if shrink_duration > 0 else 1.0
-        scale = scale_start + (scale_end - scale_start) * shrink_progress
-        z = center_z + z_offset * scale
-
-        pos = [round(x, 6), round(y, 6), round(z, 6)]
-        points.append([round(t, 4), pos, [pos]])
-
-    return {"version": 1, "points": points}
+def stationary_keyframe_times(duration: float, fps: float = 25.0) -> List[float]:
+    """Keyframe times of a stationary hold: the first and last keyframe only."""
+    n_keyframes = int(duration * fps) + 1
+    end = round((n_keyframes - 1) / fps, 4)
+    return [0.0, end] if n_keyframes > 1 else [0.0]
 
 
 def create_stationary_trajectory(
@@ -206,35 +351,52 @@ def create_stationary_trajectory(
     duration: float,
     fps: float = 25.0
 ) -> Dict[str, Any]:
-    """Create trajectory for a stationary drone."""
-    n_keyframes = int(duration * fps) + 1
-    dt = 1.0 / fps
+    """
+    Create trajectory for a stationary drone.
 
+    A hold needs no intermediate keyframes: one segment from t=0 to the last
+    keyframe time keeps the drone in place for the whole show.
+    """
     pos = [round(position[0], 6), round(position[1], 6), round(position[2], 6)]
-    points = [[round(i * dt, 4), pos, [pos]] for i in range(n_keyframes)]
+    points = [[t, pos, [pos]] for t in stationary_keyframe_times(duration, fps)]
 
     return {"version": 1, "points": points}
 
 
+def create_stationary_trajectory_template(duration: float, fps: float = 25.0) -> str:
+    """
+    Build the trajectory.json text of a stationary drone as a format template.
+
+    Every stationary drone shares the same keyframe times, so the JSON is laid
+    out once and each drone only fills in its position:
+    template % {"x": x, "y": y, "z": z} with coordinates rounded to 6 decimals
+    gives the same text as json.dumps(create_stationary_trajectory(...)).
+    """
+    point = '[%s,[%%(x)r,%%(y)r,%%(z)r],[[%%(x)r,%%(y)r,%%(z)r]]]'
+    points = ','.join(point % json.dumps(t) for t in stationary_keyframe_times(duration, fps))
+    return '{"version":1,"points":[' + points + ']}'
+
+
 def create_lights_data() -> Dict[str, Any]:
     """Create default lights configuration."""
     return {"version": 1, "data": "B4wlAAwK////"}
 
 
-def create_show_metadata(n_drones: int, duration: float, title: str) -> Dict[str, Any]:
-    """Create show.json metadata."""
-    drones = []
-    for i in range(1, n_drones + 1):
-        drones.append({
+def create_show_metadata(vertices: np.ndarray, duration: float, title: str) -> Dict[str, Any]:
+    """Create show.json metadata with each drone's home and landing at its vertex."""
+    drones = [
+        {
             "type": "generic",
             "settings": {
                 "trajectory": {"$ref": f"./drones/Drone {i}/trajectory.json#"},
                 "lights": {"$ref": f"./drones/Drone {i}/lights.json#"},
-                "home": [0.0, 0.0, 0.0],
-                "landAt": [0.0, 0.0, 0.0],
+                "home": pos,
+                "landAt": pos,
                 "name": f"Drone {i}"
             }
-        })
+        }
+        for i, pos in enumerate(np.asarray(vertices, dtype=float).tolist(), start=1)
+    ]
 
     return {
         "version": 1,
@@ -275,13 +437,63 @@ def create_cues_data(duration: float, title: str) -> Dict[str, Any]:
     }
 
 
+def encode_trajectory_batch(builder, positions: np.ndarray, args: tuple) -> List[bytes]:
+    """Build and encode the trajectories of one batch of drones."""
+    return [encode_keyframes(times, drone_positions) for times, drone_positions in builder(positions, *args)]
+
+
+def iter_encoded_trajectories(builder, positions: np.ndarray, args: tuple,
+                              workers: int = 1) -> Iterator[bytes]:
+    """
+    Yield every drone's encoded trajectory.json, in drone order.
+
+    builder is one of the batched create_*_keyframes functions, called as
+    builder(positions, *args). With workers > 1, batches of drones are built
+    and encoded in a process pool while the caller writes finished ones to the
+    archive, with at most 2 * workers batches submitted ahead of the writer.
+    """
+    if workers <= 1:
+        for times, drone_positions in builder(positions, *args):
+            yield encode_keyframes(times, drone_positions)
+        return
+
+    # Keep at most two batches per worker in flight, so finished batches
+    # cannot pile up while the caller is still writing earlier ones
+    pending = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in iter_position_batches(positions):
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+            pending.append(pool.submit(encode_trajectory_batch, builder, batch, args))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_zip_entry(zf: zipfile.ZipFile, name: str, data: bytes, date_time: tuple,
+                    compress_type: int = None) -> None:
+    """
+    Write one file into the archive with a shared timestamp.
+
+    Passing a prepared ZipInfo skips the per-entry clock lookup and attribute
+    setup that ZipFile.writestr does for plain names. compress_type overrides
+    the archive's compression method for this entry.
+    """
+    info = zipfile.ZipInfo(name, date_time)
+    info.compress_type = zf.compression if compress_type is None else compress_type
+    info.external_attr = 0o600 << 16
+    zf.writestr(info, data, compresslevel=zf.compresslevel)
+
+
 def export_vertices_to_skybrush(
     vertices: np.ndarray,
     output_file: str = "vertices_show.skyc",
     n_frames: int = 100,
     fps: float = 25.0,
     show_title: str = "Polyhedron Vertices",
-    animation: dict = None
+    animation: dict = None,
+    workers: int = 1,
+    compression: int = zipfile.ZIP_DEFLATED,
+    compresslevel: int = 1
 ) -> bool:
     """
     Export vertices to Skybrush .skyc format.
@@ -293,6 +505,10 @@ def export_vertices_to_skybrush(
         fps: Keyframes per second (default 25)
         show_title: Show title
         animation: Animation settings dict
+        workers: Processes building animated trajectories (default 1, in-process)
+        compression: zipfile compression method, e.g. zipfile.ZIP_STORED to skip
+            compressing (default ZIP_DEFLATED)
+        compresslevel: Compression level for the method (default 1, fastest deflate)
 
     Returns:
         True if successful
@@ -331,57 +547,65 @@ def export_vertices_to_skybrush(
         print(f"  Rotation: {'YES - ' + str(rotation_speed) + ' m/s' if enable_rotation else 'NO'}")
         print(f"  Vertical Scale: {'YES - ' + str(scale_start) + ' → ' + str(scale_end) + ' at ' + str(shrink_speed) + ' m/s' if enable_scale else 'NO'}")
 
-        # Calculate center for rotation (XY) and scaling (Z)
-        center_x = float(np.mean(vertices[:, 0]))
-        center_y = float(np.mean(vertices[:, 1]))
-        center_z = float(np.mean(vertices[:, 2]))
+        # Calculate center for rotation (XY) and scaling (Z) in one reduction
+        positions = np.asarray(vertices, dtype=float)
+        center_x, center_y, center_z = positions.mean(axis=0).tolist()
         center = [center_x, center_y]
         print(f"  Rotation center: ({center_x:.2f}, {center_y:.2f})")
         print(f"  Z scale center: {center_z:.2f}")
 
         # Create ZIP archive
-        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as zf:
+        date_time = time.localtime()[:6]
+        with zipfile.ZipFile(output_file, 'w', compression, compresslevel=compresslevel) as zf:
             # Create show.json
-            show_data = create_show_metadata(n_vertices, duration, show_title)
-            for i, vertex in enumerate(vertices):
-                pos = [float(vertex[0]), float(vertex[1]), float(vertex[2])]
-                show_data["swarm"]["drones"][i]["settings"]["home"] = pos
-                show_data["swarm"]["drones"][i]["settings"]["landAt"] = pos
-            zf.writestr('show.json', json.dumps(show_data, indent=2))
+            show_data = create_show_metadata(positions, duration, show_title)
+            write_zip_entry(zf, 'show.json', encode_json(show_data), date_time)
 
             # Create cues.json
-            zf.writestr('cues.json', json.dumps(create_cues_data(duration, show_title), indent=2))
+            write_zip_entry(zf, 'cues.json', encode_json(create_cues_data(duration, show_title)), date_time)
+
+            # Every drone gets the same lights program - encode it once. It is a
+            # few dozen bytes, so it is stored rather than deflated per drone.
+            lights_json = encode_json(create_lights_data())
+
+            # Choose trajectory type; animated trajectories are computed in
+            # batches of drones and handed out one per drone, already encoded
+            trajectories = itertools.repeat(None)
+            stationary_template = None
+            if enable_rotation and enable_scale:
+                trajectories = iter_encoded_trajectories(create_combined_keyframes, positions, (
+                    center, rotation_speed,
+                    scale_start, scale_end, duration, shrink_speed, center_z, fps
+                ), workers)
+            elif enable_rotation:
+                trajectories = iter_encoded_trajectories(create_rotation_keyframes, positions, (
+                    center, rotation_speed, duration, fps
+                ), workers)
+            elif enable_scale:
+                trajectories = iter_encoded_trajectories(create_vertical_scale_keyframes, positions, (
+                    scale_start, scale_end, shrink_speed, center_z, fps
+                ), workers)
+            else:
+                # Stationary drones differ only by position - lay out their JSON once
+                stationary_template = create_stationary_trajectory_template(duration, fps)
 
             # Create trajectory for each drone
             print(f"\n  Writing trajectories...")
-            for i, vertex in enumerate(vertices):
-                start_pos = [float(vertex[0]), float(vertex[1]), float(vertex[2])]
-
-                # Choose trajectory type
-                if enable_rotation and enable_scale:
-                    traj = create_combined_trajectory(
-                        start_pos, center, rotation_speed,
-                        scale_start, scale_end, duration, shrink_speed, center_z, fps
-                    )
-                elif enable_rotation:
-                    traj = create_rotation_trajectory(
-                        start_pos, center, rotation_speed, duration, fps
-                    )
-                elif enable_scale:
-                    traj = create_vertical_scale_trajectory(
-                        start_pos, scale_start, scale_end, shrink_speed, center_z, fps
-                    )
-                else:
-                    traj = create_stationary_trajectory(start_pos, duration, fps)
+            # Convert all positions to Python floats in one call rather than per row
+            for i, (start_pos, traj_json) in enumerate(zip(positions.tolist(), trajectories)):
+                if traj_json is None:
+                    x, y, z = (round(c, 6) for c in start_pos)
+                    traj_json = (stationary_template % {"x": x, "y": y, "z": z}).encode()
 
                 # Write trajectory
                 drone_name = f"Drone {i + 1}"
-                zf.writestr(f"drones/{drone_name}/trajectory.json", json.dumps(traj, indent=2))
-                zf.writestr(f"drones/{drone_name}/lights.json", json.dumps(create_lights_data(), indent=2))
+                write_zip_entry(zf, f"drones/{drone_name}/trajectory.json", traj_json, date_time)
+                write_zip_entry(zf, f"drones/{drone_name}/lights.json", lights_json, date_time,
+                                zipfile.ZIP_STORED)
 
                 # Log first 3 drones' trajectory samples
                 if i < 3:
-                    pts = traj["points"]
+                    pts = json.loads(traj_json)["points"]
                     print(f"\n    {drone_name} trajectory ({len(pts)} keyframes):")
                     print(f"      t=0.00s: x={pts[0][1][0]:.2f}, y={pts[0][1][1]:.2f}, z={pts[0][1][2]:.2f}")
                     mid = len(pts) // 4